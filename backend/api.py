@@ -4,14 +4,28 @@
 # ==================================================
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
-import joblib
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import httpx
 import numpy as np
 import os
-import requests
 from dotenv import load_dotenv
 
+from core import (
+    models,
+    prediction_cache,
+    load_models,
+    create_feature_matrix,
+    run_inference,
+    postprocess_batch,
+    DEFAULT_FEATURES,
+    N_FEATURES,
+)
+
 # ============================
 #  LOAD ENVIRONMENT VARIABLES
 # ============================
@@ -29,7 +43,7 @@ else:
 # ============================
 #  FASTAPI APP SETUP
 # ============================
-app = FastAPI(title="Football Prediction & Data API", version="2.0")
+app = FastAPI(title="Football Prediction & Data API", version="2.0", default_response_class=ORJSONResponse)
 
 # CORS setup — restricted to known origins for security
 origins = [
@@ -46,15 +60,21 @@ app.add_middleware(
 )
 
 # ============================
-#  MODEL LOADING
+#  REQUEST / RESPONSE MODELS
 # ============================
-models = {}
-
 class PredictionRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     home_team: str
     away_team: str
 
 
+class BatchPredictionRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    pairs: List[PredictionRequest]
+
+
 class PredictionResponse(BaseModel):
     predicted_result: str
     predicted_home_score: float
@@ -67,38 +87,126 @@ class PredictionResponse(BaseModel):
     ai_analysis: str
 
 
-def load_models():
-    models_dir = "/backend/football_models/"
-    if not os.path.exists(models_dir):
-        raise FileNotFoundError("Models directory not found. Please train models first.")
-
-    try:
-        models["class_model"] = joblib.load(os.path.join(models_dir, "classification_model.pkl"))
-        models["reg_model"] = joblib.load(os.path.join(models_dir, "regression_model.pkl"))
-        models["home_encoder"] = joblib.load(os.path.join(models_dir, "home_team_encoder.pkl"))
-        models["away_encoder"] = joblib.load(os.path.join(models_dir, "away_team_encoder.pkl"))
-        models["result_encoder"] = joblib.load(os.path.join(models_dir, "result_encoder.pkl"))
-        print("✅ Models loaded successfully!")
-        return True
-    except Exception as e:
-        print(f"❌ Error loading models: {e}")
-        return False
+# The factor texts only depend on the predicted result, so build them once
+# as immutable tuples instead of allocating fresh lists on every response
+KEY_FACTORS = {
+    "H": ("Home advantage", "Strong recent form", "Favorable head-to-head record", "High home win probability"),
+    "A": ("Away team in excellent form", "Home team defensive vulnerabilities", "Recent away victories", "Tactical advantage"),
+    "D": ("Balanced team strengths", "Similar recent form", "Historical tendency for draws", "Defensive match expected"),
+}
+
+
+def build_prediction_response(home_team, away_team, predicted_result, result_proba, confidence, home_score, away_score):
+    """Assemble the prediction payload from one decoded row of a batch
+
+    Returns a plain dict matching the PredictionResponse schema; handlers
+    hand it straight to orjson, skipping a Pydantic instantiation per hit.
+    """
+    idx = models["result_to_idx"]
+    prob_h = float(result_proba[idx["H"]]) if "H" in idx else 0.0
+    prob_d = float(result_proba[idx["D"]]) if "D" in idx else 0.0
+    prob_a = float(result_proba[idx["A"]]) if "A" in idx else 0.0
+
+    key_factors = KEY_FACTORS[predicted_result]
+
+    if predicted_result == "H":
+        ai_analysis = f"{home_team} is predicted to win with {prob_h:.1%} win probability due to strong home form and historical advantage."
+    elif predicted_result == "A":
+        ai_analysis = f"{away_team} likely wins with {prob_a:.1%} probability, showing tactical and momentum advantage."
+    else:
+        ai_analysis = f"A draw is predicted ({prob_d:.1%} probability), indicating balanced team performance."
+
+    return {
+        "predicted_result": predicted_result,
+        "predicted_home_score": float(home_score),
+        "predicted_away_score": float(away_score),
+        "home_win_probability": prob_h,
+        "draw_probability": prob_d,
+        "away_win_probability": prob_a,
+        "confidence": float(confidence),
+        "key_factors": list(key_factors),
+        "ai_analysis": ai_analysis,
+    }
 
 
-def create_feature_vector(home_encoded, away_encoded):
-    """Generate numeric feature array for prediction"""
-    features = [
-        home_encoded, away_encoded, 1.5, 1.3, 1.7, 1.1, 1.3, 1.5,
-        0.5, 0.35, 1.0, 0.8, 0.6, -0.2, 0.5, 10, 10
-    ]
-    return np.array([features])
+# ============================
+#  MICRO-BATCHING PREDICTION QUEUE
+# ============================
+# Concurrent /predict requests are funneled through an asyncio queue so the
+# batcher can run sklearn once over a stacked matrix instead of once per request.
+MAX_BATCH_SIZE = 32
+MAX_BATCH_LATENCY = 0.005  # seconds to wait for more requests to join a batch
+
+prediction_queue = None
+batch_executor = None
+http_client = None
+
+# Reusable feature buffer for the batcher. The constant columns are filled once;
+# each batch only overwrites the two team columns and slices the rows it needs.
+# Only the single batcher task touches it, so no locking is required.
+feature_buffer = np.empty((MAX_BATCH_SIZE, N_FEATURES), dtype=np.float32)
+feature_buffer[:, 2:] = DEFAULT_FEATURES
+
+
+async def prediction_batcher():
+    """Drain the queue, run one stacked sklearn call, fan results back out"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await prediction_queue.get()]
+        try:
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(await asyncio.wait_for(prediction_queue.get(), timeout=MAX_BATCH_LATENCY))
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            X = feature_buffer[:len(batch)]
+            X[:, 0] = [models["home_idx"][home] for home, _, _ in batch]
+            X[:, 1] = [models["away_idx"][away] for _, away, _ in batch]
+
+            # sklearn releases the GIL in its C loops, so run it off the event loop
+            result_proba, goals_pred = await loop.run_in_executor(batch_executor, run_inference, X)
+            predicted_results, confidences, scores = postprocess_batch(result_proba, goals_pred)
+
+            for i, (home, away, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(
+                        build_prediction_response(
+                            home, away, predicted_results[i], result_proba[i],
+                            confidences[i], scores[i, 0], scores[i, 1]
+                        )
+                    )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Load ML models when the API starts"""
+    """Load ML models and start the prediction batcher when the API starts"""
+    global prediction_queue, batch_executor, http_client
     if not load_models():
         print("⚠️ Warning: Models failed to load. Predictions may not work.")
+    prediction_queue = asyncio.Queue()
+    batch_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+    asyncio.create_task(prediction_batcher())
+    # Shared keep-alive connection pool for all upstream api-sports calls
+    # Without a key the football-data endpoints fail upstream, but the app
+    # still boots and serves predictions (httpx rejects None header values)
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"x-apisports-key": API_KEY} if API_KEY else None,
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the upstream connection pool on shutdown"""
+    if http_client is not None:
+        await http_client.aclose()
 
 
 @app.get("/health")
@@ -113,8 +221,7 @@ async def health_check():
 async def get_teams():
     if not models:
         raise HTTPException(status_code=500, detail="Models not loaded")
-    teams = list(models["home_encoder"].classes_)
-    return {"teams": sorted(teams)}
+    return {"teams": models["teams_sorted"]}
 
 
 @app.post("/predict", response_model=PredictionResponse)
@@ -124,58 +231,65 @@ async def predict_match(request: PredictionRequest):
 
     home_team, away_team = request.home_team, request.away_team
 
-    if home_team not in models["home_encoder"].classes_:
+    if home_team not in models["home_idx"]:
         raise HTTPException(status_code=400, detail=f"Unknown home team: {home_team}")
-    if away_team not in models["away_encoder"].classes_:
+    if away_team not in models["away_idx"]:
         raise HTTPException(status_code=400, detail=f"Unknown away team: {away_team}")
     if home_team == away_team:
         raise HTTPException(status_code=400, detail="Home and away teams cannot be the same")
 
+    cached = prediction_cache.get((home_team, away_team))
+    if cached is not None:
+        return ORJSONResponse(cached)
+
     try:
-        home_encoded = models["home_encoder"].transform([home_team])[0]
-        away_encoded = models["away_encoder"].transform([away_team])[0]
-        X_predict = create_feature_vector(home_encoded, away_encoded)
-
-        result_pred = models["class_model"].predict(X_predict)[0]
-        result_proba = models["class_model"].predict_proba(X_predict)[0]
-        predicted_result = models["result_encoder"].inverse_transform([result_pred])[0]
-        confidence = float(np.max(result_proba))
-
-        goals_pred = models["reg_model"].predict(X_predict)[0]
-        predicted_home_score = max(0, float(goals_pred[0]))
-        predicted_away_score = max(0, float(goals_pred[1]))
-
-        classes = models["result_encoder"].classes_
-        prob_dict = {cls: 0.0 for cls in ["H", "D", "A"]}
-        for i, cls in enumerate(classes):
-            prob_dict[cls] = float(result_proba[i])
-
-        key_factors = []
-        if predicted_result == "H":
-            key_factors = ["Home advantage", "Strong recent form", "Favorable head-to-head record", "High home win probability"]
-        elif predicted_result == "A":
-            key_factors = ["Away team in excellent form", "Home team defensive vulnerabilities", "Recent away victories", "Tactical advantage"]
-        else:
-            key_factors = ["Balanced team strengths", "Similar recent form", "Historical tendency for draws", "Defensive match expected"]
-
-        if predicted_result == "H":
-            ai_analysis = f"{home_team} is predicted to win with {prob_dict['H']:.1%} win probability due to strong home form and historical advantage."
-        elif predicted_result == "A":
-            ai_analysis = f"{away_team} likely wins with {prob_dict['A']:.1%} probability, showing tactical and momentum advantage."
-        else:
-            ai_analysis = f"A draw is predicted ({prob_dict['D']:.1%} probability), indicating balanced team performance."
-
-        return PredictionResponse(
-            predicted_result=predicted_result,
-            predicted_home_score=predicted_home_score,
-            predicted_away_score=predicted_away_score,
-            home_win_probability=prob_dict["H"],
-            draw_probability=prob_dict["D"],
-            away_win_probability=prob_dict["A"],
-            confidence=confidence,
-            key_factors=key_factors,
-            ai_analysis=ai_analysis
-        )
+        future = asyncio.get_running_loop().create_future()
+        await prediction_queue.put((home_team, away_team, future))
+        response = await future
+        prediction_cache[(home_team, away_team)] = response
+        # Returning a Response directly skips FastAPI's output re-validation;
+        # response_model stays on the route purely for the OpenAPI schema
+        return ORJSONResponse(response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+
+@app.post("/predict_batch", response_model=List[PredictionResponse])
+async def predict_batch(request: BatchPredictionRequest):
+    """Predict many matches in one sklearn call to amortize per-call overhead"""
+    if not models:
+        raise HTTPException(status_code=500, detail="Models not loaded")
+
+    pairs = request.pairs
+    if not pairs:
+        return []
+
+    for pair in pairs:
+        if pair.home_team not in models["home_idx"]:
+            raise HTTPException(status_code=400, detail=f"Unknown home team: {pair.home_team}")
+        if pair.away_team not in models["away_idx"]:
+            raise HTTPException(status_code=400, detail=f"Unknown away team: {pair.away_team}")
+        if pair.home_team == pair.away_team:
+            raise HTTPException(status_code=400, detail="Home and away teams cannot be the same")
+
+    try:
+        home_encoded = [models["home_idx"][p.home_team] for p in pairs]
+        away_encoded = [models["away_idx"][p.away_team] for p in pairs]
+        X = create_feature_matrix(home_encoded, away_encoded)
+
+        # Same executor the batcher uses: sklearn releases the GIL in its C
+        # loops, so the event loop keeps serving other requests meanwhile
+        loop = asyncio.get_running_loop()
+        result_proba, goals_pred = await loop.run_in_executor(batch_executor, run_inference, X)
+        predicted_results, confidences, scores = postprocess_batch(result_proba, goals_pred)
+
+        return ORJSONResponse([
+            build_prediction_response(
+                pair.home_team, pair.away_team, predicted_results[i], result_proba[i],
+                confidences[i], scores[i, 0], scores[i, 1]
+            )
+            for i, pair in enumerate(pairs)
+        ])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
@@ -184,50 +298,60 @@ async def predict_match(request: PredictionRequest):
 # ============================
 BASE_URL = "https://v3.football.api-sports.io"
 
+# Upstream responses change on timescales of hours (countries, leagues, teams)
+# or minutes (fixtures); serving repeats from RAM skips the external round trip
+# and keeps us clear of api-sports rate limits. All cache access happens on the
+# event loop thread, so no extra locking is needed.
+upstream_cache = TTLCache(maxsize=512, ttl=3600)
+fixtures_cache = TTLCache(maxsize=256, ttl=300)
+
+
+async def cached_upstream_get(path, params=None):
+    """GET an upstream endpoint through the TTL cache"""
+    key = (path, tuple(sorted(params.items())) if params else None)
+    cached = upstream_cache.get(key)
+    if cached is not None:
+        return cached
+    res = await http_client.get(path, params=params)
+    data = res.json()
+    # Only cache successes; a rate-limit or 5xx body must not be served
+    # for the next hour
+    if res.status_code == 200:
+        upstream_cache[key] = data
+    return data
+
 @app.get("/countries")
-def get_countries():
+async def get_countries():
     """Fetch all available countries."""
-    headers = {"x-apisports-key": API_KEY}
-    res = requests.get(f"{BASE_URL}/countries", headers=headers)
-    return res.json()
+    return await cached_upstream_get("/countries")
 
 
 @app.get("/leagues")
-def get_leagues(country: str):
+async def get_leagues(country: str):
     """Fetch all leagues for a given country."""
-    headers = {"x-apisports-key": API_KEY}
-    url = f"{BASE_URL}/leagues?country={country}"
-    res = requests.get(url, headers=headers)
-    return res.json()
+    return await cached_upstream_get("/leagues", params={"country": country})
 
 
 @app.get("/teams/{league_id}")
-def get_teams_by_league(league_id: int, season: int = 2024):
+async def get_teams_by_league(league_id: int, season: int = 2024):
     """Fetch all teams for a given league."""
-    headers = {"x-apisports-key": API_KEY}
-    url = f"{BASE_URL}/teams?league={league_id}&season={season}"
-    res = requests.get(url, headers=headers)
-    return res.json()
+    return await cached_upstream_get("/teams", params={"league": league_id, "season": season})
 
 
 @app.get("/players")
-def get_players(team: int, season: int = 2024):
+async def get_players(team: int, season: int = 2024):
     """Fetch players for a given team and season."""
-    headers = {"x-apisports-key": API_KEY}
-    url = f"{BASE_URL}/players?team={team}&season={season}"
-    res = requests.get(url, headers=headers)
-    return res.json()
+    return await cached_upstream_get("/players", params={"team": team, "season": season})
 
 
 @app.get("/fixtures")
-def get_fixtures(
+async def get_fixtures(
     league: int = Query(..., description="League ID"),
     season: int = Query(..., description="Season year"),
     team: Optional[int] = Query(None, description="Optional team ID"),
     status: Optional[str] = Query(None, description="Match status: live, finished, etc."),
 ):
     """Fetch fixtures (matches) for a given league and season."""
-    headers = {"x-apisports-key": API_KEY}
     params = {"league": league, "season": season}
 
     if team:
@@ -235,21 +359,25 @@ def get_fixtures(
     if status:
         params["status"] = status
 
-    res = requests.get(f"{BASE_URL}/fixtures", headers=headers, params=params)
+    # Cache the simplified payload (the transform below is work worth saving
+    # too), but never serve live fixtures from cache
+    cache_key = (league, season, team, status)
+    if status != "live":
+        cached = fixtures_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    res = await http_client.get("/fixtures", params=params)
 
     if res.status_code != 200:
         raise HTTPException(status_code=res.status_code, detail="Failed to fetch fixtures")
 
     data = res.json()
-    simplified = []
-
-    for item in data.get("response", []):
-        fixture = item["fixture"]
-        teams = item["teams"]
-        goals = item["goals"]
-        league_info = item["league"]
 
-        simplified.append({
+    # Single comprehension; the inner one-tuple for binds each sub-dict once
+    # instead of re-indexing item per field
+    simplified = [
+        {
             "fixture_id": fixture["id"],
             "date": fixture["date"],
             "status": fixture["status"]["short"],
@@ -262,9 +390,15 @@ def get_fixtures(
             "venue": fixture["venue"]["name"] if fixture.get("venue") else None,
             "league": league_info["name"],
             "season": league_info["season"]
-        })
+        }
+        for item in data.get("response", [])
+        for fixture, teams, goals, league_info in ((item["fixture"], item["teams"], item["goals"], item["league"]),)
+    ]
 
-    return {"fixtures": simplified, "count": len(simplified)}
+    payload = {"fixtures": simplified, "count": len(simplified)}
+    if status != "live":
+        fixtures_cache[cache_key] = payload
+    return payload
 
 # ============================
 #  RUN LOCALLY / ENTRYPOINT
@@ -272,4 +406,13 @@ def get_fixtures(
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("api:app", host="0.0.0.0", port=port)
+    # uvloop/httptools replace the pure-Python event loop and HTTP parser
+    # with their C implementations (both pinned in requirements.txt)
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,  # Railway terminates TLS at its load balancer
+    )
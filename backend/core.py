@@ -0,0 +1,128 @@
+# ==================================================
+#  SHARED MODEL LOADING & INFERENCE CORE
+# ==================================================
+# Everything the prediction hot path needs, defined exactly once so any
+# entrypoint (uvicorn, gunicorn workers, scripts) warms the same caches.
+import os
+
+# One BLAS thread per worker: parallelism comes from gunicorn workers and the
+# inference thread pool, so letting OpenBLAS/MKL spawn nproc threads in every
+# worker would just oversubscribe the cores. Must be set before numpy loads.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+import joblib
+import numpy as np
+
+# Resolves relative to this file by default so the API works no matter the
+# working directory; deployments can point elsewhere via MODELS_DIR
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "football_models"))
+
+models = {}
+
+# Predictions depend only on the team identities (every other feature is a
+# hardcoded constant), so each (home, away) pair is deterministic and cacheable.
+# With ~20 teams that is at most a few hundred entries.
+prediction_cache = {}
+
+# Default values for the 15 non-team features (form, goals, win rates, etc.)
+DEFAULT_FEATURES = np.array(
+    [1.5, 1.3, 1.7, 1.1, 1.3, 1.5, 0.5, 0.35, 1.0, 0.8, 0.6, -0.2, 0.5, 10, 10],
+    dtype=np.float32
+)
+N_FEATURES = 2 + len(DEFAULT_FEATURES)
+
+
+def load_models():
+    if not os.path.exists(MODELS_DIR):
+        raise FileNotFoundError("Models directory not found. Please train models first.")
+
+    try:
+        # mmap the big tree arrays read-only so multiple uvicorn workers share
+        # one page-cache copy instead of each materializing its own
+        models["class_model"] = joblib.load(os.path.join(MODELS_DIR, "classification_model.pkl"), mmap_mode="r")
+        # Prefer a compiled ONNX graph for the classifier when the trainer
+        # exported one: onnxruntime walks the whole ensemble in native code
+        # instead of Python dispatch per tree
+        models.pop("class_session", None)
+        onnx_path = os.path.join(MODELS_DIR, "classification_model.onnx")
+        if os.path.exists(onnx_path):
+            try:
+                import onnxruntime as ort
+
+                opts = ort.SessionOptions()
+                opts.intra_op_num_threads = 1  # uvicorn workers supply the parallelism
+                session = ort.InferenceSession(onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+                models["class_session"] = session
+                models["onnx_input"] = session.get_inputs()[0].name
+                models["onnx_proba"] = session.get_outputs()[1].name
+                print("✅ Using ONNX Runtime for classification inference")
+            except ImportError:
+                print("ℹ️ onnxruntime not installed — classification stays on sklearn")
+        models["reg_model"] = joblib.load(os.path.join(MODELS_DIR, "regression_model.pkl"), mmap_mode="r")
+        models["home_encoder"] = joblib.load(os.path.join(MODELS_DIR, "home_team_encoder.pkl"))
+        models["away_encoder"] = joblib.load(os.path.join(MODELS_DIR, "away_team_encoder.pkl"))
+        models["result_encoder"] = joblib.load(os.path.join(MODELS_DIR, "result_encoder.pkl"))
+        # O(1) name -> encoded-id lookups; LabelEncoder.transform does a
+        # searchsorted plus array allocation per call, which is pure overhead here
+        models["home_idx"] = {c: i for i, c in enumerate(models["home_encoder"].classes_)}
+        models["away_idx"] = {c: i for i, c in enumerate(models["away_encoder"].classes_)}
+        # Everything below is invariant until the next load; compute it once
+        # here rather than on every request
+        models["teams_sorted"] = sorted(models["home_encoder"].classes_.tolist())
+        models["result_to_idx"] = {c: i for i, c in enumerate(models["result_encoder"].classes_)}
+        # Map probability columns (ordered by the classifier's classes_) straight
+        # to result letters; argmax + one array index replaces inverse_transform
+        # per call and stays correct even if the two orderings ever diverge
+        class_order = models["class_model"].classes_.astype(int)
+        models["result_labels"] = models["result_encoder"].inverse_transform(class_order)
+        prediction_cache.clear()  # cached results are stale once models change
+        print("✅ Models loaded successfully!")
+        return True
+    except Exception as e:
+        print(f"❌ Error loading models: {e}")
+        return False
+
+
+def create_feature_vector(home_encoded, away_encoded):
+    """Generate numeric feature array for predicting one match"""
+    return create_feature_matrix([home_encoded], [away_encoded])
+
+
+def create_feature_matrix(home_encoded, away_encoded):
+    """Stack N encoded team pairs into one (N, 17) feature matrix"""
+    n = len(home_encoded)
+    X = np.empty((n, N_FEATURES), dtype=np.float32)
+    X[:, 0] = home_encoded
+    X[:, 1] = away_encoded
+    X[:, 2:] = DEFAULT_FEATURES
+    return X
+
+
+def run_inference(X):
+    """Run both sklearn models on a stacked feature matrix"""
+    session = models.get("class_session")
+    if session is not None:
+        result_proba = session.run([models["onnx_proba"]], {models["onnx_input"]: X})[0]
+    else:
+        result_proba = models["class_model"].predict_proba(X)
+    goals_pred = models["reg_model"].predict(X)
+    # sklearn hands back float64; float32 is plenty for probabilities and
+    # keeps downstream arithmetic on the same dtype as the feature buffers
+    return (
+        result_proba.astype(np.float32, copy=False),
+        goals_pred.astype(np.float32, copy=False),
+    )
+
+
+def postprocess_batch(result_proba, goals_pred):
+    """Decode a whole batch of raw model outputs in vectorized numpy passes
+
+    Returns result labels, per-row confidences and zero-clipped score pairs,
+    so per-row work is reduced to string formatting.
+    """
+    predicted_results = models["result_labels"][np.argmax(result_proba, axis=1)]
+    confidences = result_proba.max(axis=1)
+    scores = np.maximum(goals_pred, 0.0)
+    return predicted_results, confidences, scores
@@ -0,0 +1,1099 @@
+"""
+Enhanced ESPN Player Scraper
+Scrapes player data (bio + season stats) from ESPN squad and profile pages
+for the top European leagues and saves everything to Excel/CSV.
+"""
+
+import asyncio
+import functools
+from dataclasses import dataclass
+import os
+import random
+import time
+import re
+import sys
+import numpy as np
+import pandas as pd
+import xlsxwriter
+import httpx
+import lxml.html
+from bs4 import BeautifulSoup
+
+# Optional on-disk HTTP cache: repeat runs hit SQLite instead of ESPN
+try:
+    import hishel
+    HISHEL_AVAILABLE = True
+except ImportError:
+    HISHEL_AVAILABLE = False
+
+# orjson decodes ESPN's large hydration blobs several times faster than
+# stdlib json; fall back silently when it isn't installed
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def _json_loads(data):
+        return json.loads(data)
+from datetime import datetime
+
+# Only advertise the compressions httpx can actually decode here: offering
+# br/zstd without the decoder packages would make ESPN send bodies we then
+# pass through undecoded
+_ACCEPT_ENCODING = 'gzip, deflate'
+try:
+    # httpx accepts either brotli binding
+    try:
+        import brotlicffi  # noqa: F401
+    except ImportError:
+        import brotli  # noqa: F401
+    _ACCEPT_ENCODING += ', br'
+except ImportError:
+    pass
+try:
+    import zstandard  # noqa: F401
+    _ACCEPT_ENCODING += ', zstd'
+except ImportError:
+    pass
+
+
+BASE_URL = "https://www.espn.com"
+
+# Major leagues with ESPN team IDs, frozen at module scope so per-instance
+# construction cost is zero
+MAJOR_LEAGUES = (
+    ('Premier League', 'ENG.1', (
+        (359, 'Arsenal'),
+        (364, 'Liverpool'),
+        (382, 'Manchester City'),
+        (360, 'Manchester United'),
+        (363, 'Chelsea'),
+        (367, 'Tottenham Hotspur'),
+        (361, 'Newcastle United'),
+        (368, 'Aston Villa')
+    )),
+    ('La Liga', 'ESP.1', (
+        (83, 'Barcelona'),
+        (86, 'Real Madrid'),
+        (1068, 'Atletico Madrid'),
+        (243, 'Sevilla'),
+        (94, 'Villarreal'),
+        (97, 'Real Sociedad')
+    )),
+    ('Bundesliga', 'GER.1', (
+        (132, 'Bayern Munich'),
+        (124, 'Borussia Dortmund'),
+        (131, 'Bayer Leverkusen'),
+        (133, 'RB Leipzig')
+    )),
+    ('Serie A', 'ITA.1', (
+        (111, 'Juventus'),
+        (103, 'AC Milan'),
+        (110, 'Inter Milan'),
+        (114, 'Napoli'),
+        (104, 'AS Roma')
+    )),
+    ('Ligue 1', 'FRA.1', (
+        (160, 'Paris Saint-Germain'),
+        (176, 'Marseille'),
+        (166, 'Monaco')
+    ))
+)
+
+# Squad URLs never change within a run; build them once at import
+_SQUAD_URLS = tuple(
+    {
+        'url': f"{BASE_URL}/soccer/team/squad/_/id/{team_id}/league/{league_code}/season/2025",
+        'team_name': team_name,
+        'league': league_name,
+        'league_code': league_code,
+        'team_id': team_id
+    }
+    for league_name, league_code, teams in MAJOR_LEAGUES
+    for team_id, team_name in teams
+)
+
+COUNTRIES = (
+    'England', 'Spain', 'Germany', 'Italy', 'France', 'Brazil',
+    'Argentina', 'Portugal', 'Netherlands', 'Belgium', 'Croatia',
+    'Uruguay', 'Colombia', 'Mexico', 'United States', 'Wales',
+    'Scotland', 'Ireland', 'Norway', 'Sweden', 'Denmark', 'Poland',
+    'Austria', 'Switzerland', 'Serbia', 'Senegal', 'Nigeria',
+    'Ghana', 'Ivory Coast', 'Cameroon', 'Morocco', 'Algeria',
+    'Egypt', 'Japan', 'South Korea', 'Australia', 'Canada',
+    'Ecuador', 'Chile', 'Turkey'
+)
+
+# ESPN pages embed the structured state the HTML is rendered from in a
+# window['__espnfitt__'] script tag
+_ESPNFITT_RE = re.compile(rb"window\['__espnfitt__'\]\s*=\s*(\{.*?\});\s*</script>", re.DOTALL)
+
+# One C-level scan instead of 40 substring checks per player; longest
+# names first so e.g. 'South Korea' wins over a bare 'Korea' prefix match
+_COUNTRY_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(c) for c in sorted(COUNTRIES, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ScrapingConfig:
+    """Central knobs for the scraping run"""
+    TARGET_PLAYERS: int = 250
+    MAX_WORKERS: int = 10  # concurrent in-flight requests (coroutines, not threads)
+    DELAY_BETWEEN_REQUESTS: float = 1.0
+    MAX_RETRIES: int = 3
+    CACHE_TTL: int = 6 * 3600  # seconds before cached pages expire
+    ENHANCE_DETAILS: bool = True
+    SAVE_DEBUG_HTML: bool = True
+
+
+# Slotted instance: attribute reads skip the class-dict MRO walk, and
+# frozen means a run can't mutate its knobs mid-flight
+CFG = ScrapingConfig()
+
+
+class ScrapingMonitor:
+    """Tracks scraping progress and prints periodic rate updates"""
+
+    def __init__(self):
+        self._start_ns = 0
+        self.players_scraped = 0
+        self.errors = 0
+
+    def start(self):
+        # monotonic_ns can't regress with clock adjustments and keeps the
+        # rate math in integer nanoseconds
+        self._start_ns = time.monotonic_ns()
+
+    def log_player(self, player_name):
+        self.players_scraped += 1
+        if self.players_scraped % 10 == 0:
+            elapsed_ns = time.monotonic_ns() - self._start_ns
+            rate = self.players_scraped * 1_000_000_000 // max(elapsed_ns, 1)
+            print(f"  📊 Progress: {self.players_scraped} players ({rate} players/sec)")
+
+    def log_error(self):
+        self.errors += 1
+
+
+class EnhancedESPNPlayerScraper:
+    """
+    Scrapes squad pages for player lists and optionally enhances each player
+    with bio details from their individual profile page
+    """
+
+    # Precompiled at class scope: these run 15+ times per player across 250
+    # players, and re's internal cache recompiles once it tops out at 512
+    # patterns
+    _AGE_RES = [re.compile(p, re.IGNORECASE) for p in (
+        r'Age[:\s]+(\d{1,2})',
+        r'(\d{1,2})\s*years?\s*old',
+        r'Born.*?\((\d{1,2})\)'
+    )]
+    _HEIGHT_RE = re.compile(r"(\d)'\s?(\d{1,2})\"|(\d\.\d{2})\s*m", re.IGNORECASE)
+    _WEIGHT_RE = re.compile(r'(\d{2,3})\s*(?:lbs|kg)', re.IGNORECASE)
+    _ENHANCED_STAT_RES = {
+        name: [re.compile(p, re.IGNORECASE) for p in patterns]
+        for name, patterns in {
+            'Matches Played': (r'Appearances[:\s]+(\d+)', r'Matches[:\s]+(\d+)', r'APP[:\s]+(\d+)'),
+            'Minutes Played': (r'Minutes[:\s]+([\d,]+)', r'MIN[:\s]+([\d,]+)'),
+            'Goals': (r'Goals[:\s]+(\d+)', r'\bG[:\s]+(\d+)'),
+            'Assists': (r'Assists[:\s]+(\d+)', r'\bA[:\s]+(\d+)'),
+            'Shots': (r'Shots[:\s]+(\d+)', r'SH[:\s]+(\d+)'),
+            'Shots on Target': (r'Shots on Target[:\s]+(\d+)', r'ST[:\s]+(\d+)'),
+            'Pass Completion %': (r'Pass Completion[:\s]+([\d.]+)', r'PC%[:\s]+([\d.]+)'),
+            'Yellow Cards': (r'Yellow Cards[:\s]+(\d+)', r'YC[:\s]+(\d+)'),
+            'Red Cards': (r'Red Cards[:\s]+(\d+)', r'RC[:\s]+(\d+)'),
+            'Clean Sheets': (r'Clean Sheets[:\s]+(\d+)', r'CS[:\s]+(\d+)'),
+            'Saves': (r'Saves[:\s]+(\d+)', r'SV[:\s]+(\d+)')
+        }.items()
+    }
+
+    def __init__(self):
+        self.base_url = BASE_URL
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept-Language': 'en-US,en;q=0.9',
+            # br/zstd cut body sizes 4-6x over gzip when their decoder
+            # packages are installed; the header only lists what we can
+            # actually decode
+            'Accept-Encoding': _ACCEPT_ENCODING
+        }
+        # HTTP/2 client: many concurrent GETs multiplex over one or two TLS
+        # connections to www.espn.com instead of a handshake per request
+        client_kwargs = dict(
+            http2=True,
+            headers=self.headers,
+            timeout=15,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=20)
+        )
+        if HISHEL_AVAILABLE:
+            # SQLite-backed cache; force_cache stores pages even though ESPN
+            # sends no-cache headers, so reruns skip the network entirely.
+            # 404s are cached too: missing profile pages stay missing, so
+            # there's no point re-requesting them every run.
+            self.client = hishel.AsyncCacheClient(
+                storage=hishel.AsyncSQLiteStorage(ttl=CFG.CACHE_TTL),
+                controller=hishel.Controller(
+                    force_cache=True,
+                    cacheable_status_codes=[200, 301, 308, 404]
+                ),
+                **client_kwargs
+            )
+        else:
+            print("💡 Install 'hishel' to cache pages between runs")
+            self.client = httpx.AsyncClient(**client_kwargs)
+        self.monitor = ScrapingMonitor()
+
+        # Request spacing shared across all tasks; only real network
+        # round trips advance the deadline, so cache hits flow freely
+        self._rate_lock = asyncio.Lock()
+        self._next_request = 0.0
+
+        # "When scraping started", stamped once per run instead of a fresh
+        # Timestamp+strftime per player row
+        self._scrape_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        # Duplicates are rejected at insert time; checks between awaits are
+        # atomic on the event loop, so no lock is needed
+        self._seen = set()
+
+    def _is_duplicate(self, player_name, team_name):
+        """Record a (name, team) key, reporting whether it was already seen"""
+        key = (player_name.casefold(), team_name.casefold())
+        if key in self._seen:
+            return True
+        self._seen.add(key)
+        return False
+
+    async def _wait_for_slot(self):
+        """Block until the minimum spacing between requests has elapsed"""
+        while True:
+            async with self._rate_lock:
+                delay = self._next_request - time.monotonic()
+                if delay <= 0:
+                    return
+            await asyncio.sleep(delay)
+
+    async def _mark_request(self):
+        """Push the next allowed request out by the politeness interval"""
+        async with self._rate_lock:
+            self._next_request = time.monotonic() + CFG.DELAY_BETWEEN_REQUESTS
+
+    async def _get_page_bytes(self, url, force_refresh=False):
+        """
+        Fetch a page's raw bytes, retrying on failure
+
+        Args:
+            url: Page URL to fetch
+            force_refresh: Bypass the on-disk cache for this request
+
+        Returns:
+            Response body bytes or None if all retries failed
+        """
+        for attempt in range(CFG.MAX_RETRIES):
+            try:
+                extensions = {}
+                if HISHEL_AVAILABLE and force_refresh:
+                    extensions['cache_disabled'] = True
+                await self._wait_for_slot()
+                response = await self.client.get(url, extensions=extensions)
+                # Throttled: back off for as long as ESPN asks (or
+                # exponentially with jitter) instead of burning a retry
+                # on the next fixed-delay attempt
+                if response.status_code == 429:
+                    retry_after = response.headers.get('Retry-After')
+                    wait = int(retry_after) if retry_after and retry_after.isdigit() \
+                        else (2 ** attempt) + random.random()
+                    print(f"  ⏳ Rate limited, backing off {wait:.1f}s: {url}")
+                    await asyncio.sleep(wait)
+                    continue
+                response.raise_for_status()
+                # Cache hits don't touch ESPN, so no politeness delay needed
+                if not response.extensions.get('from_cache'):
+                    await self._mark_request()
+                return response.content
+
+            except Exception as e:
+                print(f"  ⚠️ Attempt {attempt + 1} failed for {url}: {e}")
+                self.monitor.log_error()
+                await asyncio.sleep(CFG.DELAY_BETWEEN_REQUESTS * (attempt + 1))
+
+        return None
+
+    async def get_page_content(self, url, force_refresh=False):
+        """
+        Fetch a page and return parsed soup
+
+        Args:
+            url: Page URL to fetch
+            force_refresh: Bypass the on-disk cache for this request
+
+        Returns:
+            BeautifulSoup object or None if all retries failed
+        """
+        content = await self._get_page_bytes(url, force_refresh=force_refresh)
+        if content is None:
+            return None
+        # ESPN serves UTF-8; saying so skips bs4's per-page encoding sniff
+        return BeautifulSoup(content, 'lxml', from_encoding='utf-8')
+
+    def get_team_squad_urls(self):
+        """
+        Squad page URLs for all configured teams
+
+        Returns:
+            Tuple of dicts with url, team_name, league and league_code
+        """
+        return _SQUAD_URLS
+
+    async def fetch_roster_json(self, team_id, league_code):
+        """
+        Fetch a team roster from ESPN's site API
+
+        Args:
+            team_id: ESPN team ID
+            league_code: ESPN league code (e.g. 'ENG.1')
+
+        Returns:
+            Parsed JSON dict, or None if the endpoint is unavailable
+        """
+        url = (f"https://site.api.espn.com/apis/site/v2/sports/soccer/"
+               f"{league_code.lower()}/teams/{team_id}/roster")
+        try:
+            await self._wait_for_slot()
+            response = await self.client.get(url, headers={'Accept': 'application/json'})
+            if not response.extensions.get('from_cache'):
+                await self._mark_request()
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            return None
+
+    def _players_from_roster_json(self, data, squad_info):
+        """Map roster API athletes straight into player dicts"""
+        players = []
+        groups = data.get('athletes', [])
+        for group in groups:
+            # The API nests athletes under position groups; some leagues
+            # return them flat
+            athletes = group.get('items', [group]) if isinstance(group, dict) else []
+            for athlete in athletes:
+                name = athlete.get('displayName') or athlete.get('fullName', '')
+                if not name or self._is_duplicate(name, squad_info['team_name']):
+                    continue
+
+                profile_url = ''
+                for link in athlete.get('links', []):
+                    if 'playercard' in link.get('rel', []):
+                        profile_url = link.get('href', '')
+                        break
+
+                player_data = {
+                    'Player Name': name,
+                    'Team/Club': squad_info['team_name'],
+                    'League': squad_info['league'],
+                    'Position': athlete.get('position', {}).get('abbreviation', ''),
+                    'Jersey Number': athlete.get('jersey', ''),
+                    'Age': athlete.get('age', ''),
+                    'Height': athlete.get('displayHeight', ''),
+                    'Weight': athlete.get('displayWeight', ''),
+                    'Nationality': athlete.get('citizenship', ''),
+                    'Matches Played': '',
+                    'Minutes Played': '',
+                    'Goals': '',
+                    'Assists': '',
+                    'Shots': '',
+                    'Shots on Target': '',
+                    'Pass Completion %': '',
+                    'Yellow Cards': '',
+                    'Red Cards': '',
+                    'Clean Sheets': '',
+                    'Saves': '',
+                    'Profile URL': profile_url,
+                    'Date Scraped': self._scrape_ts
+                }
+                players.append(player_data)
+                self.monitor.log_player(name)
+        return players
+
+    def _players_from_fitt_state(self, state, squad_info):
+        """Map athletes out of the page's __espnfitt__ hydration state"""
+        players = []
+        try:
+            groups = state['page']['content']['roster']['groups']
+        except (KeyError, TypeError):
+            return players
+
+        for group in groups:
+            for athlete in group.get('athletes', []):
+                name = athlete.get('name') or athlete.get('displayName', '')
+                if not name or self._is_duplicate(name, squad_info['team_name']):
+                    continue
+
+                href = athlete.get('href', '')
+                profile_url = href if href.startswith('http') else (self.base_url + href if href else '')
+
+                position = athlete.get('position', '')
+                if isinstance(position, dict):
+                    position = position.get('abbreviation', '')
+
+                flag = athlete.get('flag', {})
+                nationality = flag.get('alt', '') if isinstance(flag, dict) else ''
+
+                player_data = {
+                    'Player Name': name,
+                    'Team/Club': squad_info['team_name'],
+                    'League': squad_info['league'],
+                    'Position': position,
+                    'Jersey Number': athlete.get('jersey', ''),
+                    'Age': athlete.get('age', ''),
+                    'Height': athlete.get('height', ''),
+                    'Weight': athlete.get('weight', ''),
+                    'Nationality': nationality,
+                    'Matches Played': '',
+                    'Minutes Played': '',
+                    'Goals': '',
+                    'Assists': '',
+                    'Shots': '',
+                    'Shots on Target': '',
+                    'Pass Completion %': '',
+                    'Yellow Cards': '',
+                    'Red Cards': '',
+                    'Clean Sheets': '',
+                    'Saves': '',
+                    'Profile URL': profile_url,
+                    'Date Scraped': self._scrape_ts
+                }
+                players.append(player_data)
+                self.monitor.log_player(name)
+        return players
+
+    async def extract_players_from_squad_page(self, squad_info):
+        """
+        Extract all players for one team, preferring the JSON roster API
+
+        Args:
+            squad_info: Dict with url/team_name/league for the squad page
+
+        Returns:
+            List of player_data dicts
+        """
+        players = []
+        team_name = squad_info['team_name']
+        league_name = squad_info['league']
+
+        # Primary path: the JSON endpoint backing the squad page — an order
+        # of magnitude fewer bytes and pre-structured fields, no DOM walk
+        roster = await self.fetch_roster_json(squad_info['team_id'], squad_info['league_code'])
+        if roster:
+            players = self._players_from_roster_json(roster, squad_info)
+            if players:
+                print(f"  ✅ {team_name}: {len(players)} players (roster API)")
+                return players
+
+        # Fallback: scrape the rendered squad page
+        content = await self._get_page_bytes(squad_info['url'])
+        if content is None:
+            print(f"  ❌ Could not load squad page for {team_name}")
+            return players
+
+        # Embedded hydration state: the JSON the squad table is rendered
+        # from is far cheaper to decode than the rendered DOM is to walk
+        fitt_match = _ESPNFITT_RE.search(content)
+        if fitt_match:
+            try:
+                state = _json_loads(fitt_match.group(1))
+            except Exception:
+                state = None
+            if state:
+                players = self._players_from_fitt_state(state, squad_info)
+                if players:
+                    print(f"  ✅ {team_name}: {len(players)} players (page state)")
+                    return players
+
+        tree = lxml.html.fromstring(content)
+
+        # One XPath harvest pulls every candidate row in C; the union
+        # covers pages where rows sit outside a standard table body
+        rows = tree.xpath('//table[contains(@class, "Table")]/tbody/tr')
+        if not rows:
+            rows = tree.xpath('//tr[contains(@class, "Table__TR")]'
+                              ' | //tr[@data-player-id]')
+
+        if not rows:
+            print(f"  ❌ No squad table found for {team_name}")
+            if CFG.SAVE_DEBUG_HTML:
+                debug_file = f"debug_{league_name.replace(' ', '_')}.html"
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    f.write(content.decode('utf-8', 'replace'))
+                print(f"  💾 Saved page HTML to {debug_file} for inspection")
+            return players
+
+        position_keywords = {
+            'goalkeeper': 'Goalkeeper', 'gk': 'Goalkeeper',
+            'defender': 'Defender', 'def': 'Defender',
+            'midfielder': 'Midfielder', 'mid': 'Midfielder',
+            'forward': 'Forward', 'fwd': 'Forward', 'attacker': 'Forward',
+            'striker': 'Forward'
+        }
+
+        for row in rows:
+            try:
+                # Extract the row's text matrix once; everything below is
+                # plain list work instead of repeated subtree walks
+                cells = row.xpath('./td | ./th')
+                texts = [cell.text_content().strip() for cell in cells]
+                if len(texts) < 2:
+                    continue
+
+                # First cell usually holds "Name 10" (name + jersey)
+                name_text = texts[0]
+                if not name_text:
+                    continue
+
+                jersey_match = re.search(r'(\d+)$', name_text)
+                jersey_number = jersey_match.group(1) if jersey_match else ''
+                player_name = re.sub(r'\d+$', '', name_text).strip()
+                if self._is_duplicate(player_name, team_name):
+                    continue
+
+                # Position: scan cell texts for a known position keyword
+                position = ''
+                for cell_text in texts:
+                    for keyword, pos_name in position_keywords.items():
+                        if keyword in cell_text.lower():
+                            position = pos_name
+                            break
+                    if position:
+                        break
+
+                # Numeric cells in order: age, appearances, goals, assists...
+                numeric_values = [cell_text for cell_text in texts[1:]
+                                  if cell_text.replace('.', '', 1).isdigit()]
+
+                # Profile link for the enhancement pass
+                profile_url = ''
+                hrefs = row.xpath('.//a[contains(@href, "/player/")]/@href')
+                if hrefs:
+                    href = hrefs[0]
+                    profile_url = href if href.startswith('http') else self.base_url + href
+
+                player_data = {
+                    'Player Name': player_name,
+                    'Team/Club': team_name,
+                    'League': league_name,
+                    'Position': position if position else texts[1],
+                    'Jersey Number': jersey_number,
+                    'Age': numeric_values[0] if len(numeric_values) > 0 else '',
+                    'Height': '',
+                    'Weight': '',
+                    'Nationality': '',
+                    'Matches Played': numeric_values[1] if len(numeric_values) > 1 else '',
+                    'Minutes Played': '',
+                    'Goals': numeric_values[2] if len(numeric_values) > 2 else '',
+                    'Assists': numeric_values[3] if len(numeric_values) > 3 else '',
+                    'Shots': '',
+                    'Shots on Target': '',
+                    'Pass Completion %': '',
+                    'Yellow Cards': '',
+                    'Red Cards': '',
+                    'Clean Sheets': '',
+                    'Saves': '',
+                    'Profile URL': profile_url,
+                    'Date Scraped': self._scrape_ts
+                }
+
+                players.append(player_data)
+                self.monitor.log_player(player_name)
+
+            except Exception:
+                continue
+
+        print(f"  ✅ {team_name}: {len(players)} players")
+        return players
+
+    async def enhance_player_details(self, player_data):
+        """
+        Fetch a player's profile page and fill in bio + season stats
+
+        Args:
+            player_data: Player dict from the squad extraction pass
+
+        Returns:
+            The same dict, enhanced in place where data was found
+        """
+        url = player_data.get('Profile URL', '')
+        if not url:
+            return player_data
+
+        # Nothing left to fill means no fetch at all — the roster API
+        # usually covers the whole bio
+        bio_missing = [key for key in ('Age', 'Height', 'Weight', 'Nationality')
+                       if not player_data.get(key)]
+        stats_missing = [key for key in self._ENHANCED_STAT_RES
+                         if not player_data.get(key)]
+        if not bio_missing and not stats_missing:
+            return player_data
+
+        soup = await self.get_page_content(url)
+        if soup is None:
+            return player_data
+
+        # The bio fields all live in the player header; extracting text from
+        # just that subtree beats walking the entire page DOM
+        header = soup.select_one('.PlayerHeader, .player-bio, main')
+        page_text = header.get_text(' ', strip=True) if header else soup.get_text()
+
+        # Age
+        if not player_data.get('Age'):
+            for pattern in self._AGE_RES:
+                match = pattern.search(page_text)
+                if match:
+                    player_data['Age'] = match.group(1)
+                    break
+
+        # Height / weight
+        if not player_data.get('Height'):
+            height_match = self._HEIGHT_RE.search(page_text)
+            if height_match:
+                player_data['Height'] = height_match.group(0)
+
+        if not player_data.get('Weight'):
+            weight_match = self._WEIGHT_RE.search(page_text)
+            if weight_match:
+                player_data['Weight'] = weight_match.group(0)
+
+        # Nationality: look for a known country name near the player header
+        if not player_data.get('Nationality'):
+            match = _COUNTRY_RE.search(page_text[:3000])
+            if match:
+                player_data['Nationality'] = match.group(1)
+
+        # Season stats from the stats section, when present
+        stats_section = soup.select_one('.Table--fixed-left, .StatBlock, .PlayerStats')
+        stats_text = stats_section.get_text() if stats_section else page_text
+
+        for stat_name, patterns in self._ENHANCED_STAT_RES.items():
+            if player_data.get(stat_name):
+                continue
+            for pattern in patterns:
+                match = pattern.search(stats_text)
+                if match:
+                    player_data[stat_name] = match.group(1).replace(',', '')
+                    break
+
+        return player_data
+
+    async def scrape_all_players_comprehensive(self, target_count=None, enhance_details=None):
+        """
+        Scrape squads from all configured teams, then enhance player details
+
+        Args:
+            target_count: Stop once this many players are collected
+            enhance_details: Fetch each player's profile page for bio/stats
+
+        Returns:
+            List of player dicts, deduplicated
+        """
+        if target_count is None:
+            target_count = CFG.TARGET_PLAYERS
+        if enhance_details is None:
+            enhance_details = CFG.ENHANCE_DETAILS
+
+        self.monitor.start()
+        self._scrape_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._seen.clear()
+        squad_urls = self.get_team_squad_urls()
+        all_players = []
+
+        print(f"🔍 Scraping {len(squad_urls)} squad pages (target: {target_count} players)...")
+
+        # One semaphore bounds in-flight requests across both the squad and
+        # profile waves; coroutines waiting on it cost bytes, not threads
+        sem = asyncio.Semaphore(CFG.MAX_WORKERS)
+
+        async def bounded_enhance(player):
+            async with sem:
+                return await self.enhance_player_details(player)
+
+        async def handle_squad(squad_info):
+            # Fused pipeline: as soon as a squad resolves, its players'
+            # profile fetches are scheduled, overlapping with the squads
+            # still downloading
+            async with sem:
+                players = await self.extract_players_from_squad_page(squad_info)
+            if enhance_details and players:
+                results = await asyncio.gather(
+                    *(bounded_enhance(player) for player in players),
+                    return_exceptions=True)
+                enhanced = []
+                for player, result in zip(players, results):
+                    if isinstance(result, Exception):
+                        self.monitor.log_error()
+                        enhanced.append(player)
+                    else:
+                        enhanced.append(result)
+                players = enhanced
+            return players
+
+        squad_tasks = [asyncio.ensure_future(handle_squad(squad_info))
+                       for squad_info in squad_urls]
+        for future in asyncio.as_completed(squad_tasks):
+            try:
+                players = await future
+                all_players.extend(players)
+            except Exception as e:
+                print(f"  ❌ Squad scrape failed: {e}")
+                self.monitor.log_error()
+
+            if len(all_players) >= target_count:
+                print(f"  🎯 Target of {target_count} players reached")
+                # Stop squads still queued or in flight instead of letting
+                # them finish (and keep hitting ESPN) in the background
+                for task in squad_tasks:
+                    task.cancel()
+                break
+
+        # Reap cancelled/failed tasks so nothing lingers past the break
+        await asyncio.gather(*squad_tasks, return_exceptions=True)
+
+        print(f"\n📋 Collected {len(all_players)} players "
+              f"({self.monitor.errors} errors)")
+        return all_players
+
+    def save_to_enhanced_excel(self, players, filename='enhanced_players_data.xlsx',
+                               pretty=True):
+        """
+        Save scraped players; CSV/Parquet always, formatted Excel optionally
+
+        Args:
+            players: List of player dicts
+            filename: Output xlsx filename (CSV/Parquet share its stem)
+            pretty: Also write the formatted Excel workbook
+        """
+        if not players:
+            print("❌ No players to save!")
+            return
+
+        df = pd.DataFrame(players)
+
+        # Clean numeric columns in one vectorized coercion
+        numeric_cols = ['Jersey Number', 'Age', 'Matches Played', 'Minutes Played',
+                        'Goals', 'Assists', 'Shots', 'Shots on Target',
+                        'Pass Completion %', 'Yellow Cards', 'Red Cards',
+                        'Clean Sheets', 'Saves']
+        present = [col for col in numeric_cols if col in df.columns]
+        df[present] = df[present].apply(pd.to_numeric, errors='coerce')
+
+        # Only pad the text columns — refilling the numeric ones with ''
+        # would flip them straight back to object dtype
+        text_cols = df.columns.difference(present)
+        df[text_cols] = df[text_cols].fillna('')
+        df = df.sort_values(['League', 'Team/Club', 'Player Name']).reset_index(drop=True)
+
+        # Cheap data outputs first: CSV always, Parquet when pyarrow is
+        # around — both are orders of magnitude faster than xlsx and are
+        # what the downstream analysis actually reads
+        stem = filename.replace('.xlsx', '')
+        df.to_csv(f"{stem}.csv", index=False)
+        try:
+            df.to_parquet(f"{stem}.parquet", engine='pyarrow', compression='zstd')
+        except (ImportError, ValueError):
+            pass
+
+        if not pretty:
+            print(f"✅ Saved {len(df)} players to '{stem}.csv'")
+            return
+
+        # constant_memory streams rows to disk as they're written instead of
+        # holding the whole sheet in RAM. It flushes a row as soon as a later
+        # one starts, so every cell must arrive in row order — the header
+        # first, then the data rows written here rather than via to_excel,
+        # whose xlsxwriter path emits column-by-column.
+        with pd.ExcelWriter(filename, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True}}) as writer:
+            workbook = writer.book
+            worksheet = workbook.add_worksheet('All Players')
+
+            header_format = workbook.add_format({
+                'bold': True,
+                'bg_color': '#4472C4',
+                'font_color': 'white',
+                'border': 1
+            })
+
+            # Auto-size from vectorized string lengths; numeric columns get
+            # a fixed width instead of a full astype(str) copy
+            text_widths = df.select_dtypes('object').apply(
+                lambda s: s.astype(str).str.len().max())
+            for col_num, column in enumerate(df.columns):
+                width = int(text_widths.get(column, 10) or 0)
+                worksheet.set_column(col_num, col_num,
+                                     min(max(width, len(column)) + 2, 30))
+
+            worksheet.write_row(0, 0, list(df.columns), header_format)
+            # xlsxwriter rejects NaN cells, so blanks become None
+            out = df.astype(object).where(df.notna(), None)
+            for row_num, row in enumerate(
+                    out.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row_num, 0, row)
+
+        print(f"✅ Saved {len(df)} players to '{filename}'")
+
+    async def close(self):
+        """Release the HTTP client"""
+        await self.client.aclose()
+
+
+# The analysis only ever touches these columns; reading the rest of the
+# sheet is wasted XML parsing
+_ANALYSIS_COLS = ['Player Name', 'Team/Club', 'League', 'Goals', 'Age', 'Nationality']
+
+# python-calamine parses xlsx in Rust, typically 5-20x faster than openpyxl
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = 'calamine'
+except ImportError:
+    _EXCEL_ENGINE = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_players_sheet(path, mtime, usecols):
+    """Cached xlsx parse; mtime in the key invalidates on file change"""
+    kwargs = {'sheet_name': 'All Players'}
+    if usecols is not None:
+        kwargs['usecols'] = list(usecols)
+    if _EXCEL_ENGINE:
+        kwargs['engine'] = _EXCEL_ENGINE
+    return pd.read_excel(path, **kwargs)
+
+
+def _read_players_sheet(filename, usecols=None):
+    """Read the 'All Players' sheet with the fastest available engine"""
+    mtime = os.path.getmtime(filename)
+    cached = _load_players_sheet(filename, mtime,
+                                 tuple(usecols) if usecols else None)
+    # Copy so callers can mutate their frame without poisoning the cache;
+    # still far cheaper than re-parsing the xlsx
+    return cached.copy()
+
+
+def analyze_scraped_data(filename='enhanced_players_data.xlsx'):
+    """
+    Print summary statistics for a previously scraped dataset
+
+    Args:
+        filename: Excel file produced by save_to_enhanced_excel
+    """
+    try:
+        df = _read_players_sheet(filename, usecols=_ANALYSIS_COLS)
+    except FileNotFoundError:
+        print(f"❌ File '{filename}' not found. Run the scraper first.")
+        return
+    except Exception as e:
+        print(f"❌ Could not read '{filename}': {e}")
+        return
+
+    print(f"\n📊 DATASET ANALYSIS: {filename}")
+    print("=" * 60)
+    print(f"Total players: {len(df)}")
+    print(f"Leagues: {df['League'].nunique()}")
+    print(f"Teams: {df['Team/Club'].nunique()}")
+
+    print("\n📋 Data completeness:")
+    # One C pass over the whole frame instead of a fresh mask per column,
+    # and one buffered write instead of a flush per line
+    total = len(df)
+    non_empty_counts = df.notna().sum()
+    sys.stdout.write('\n'.join(
+        f"  {col}: {non_empty}/{total} ({non_empty * 100.0 / total:.1f}%)"
+        for col, non_empty in non_empty_counts.items()
+    ) + '\n')
+
+    # Coerce once up-front; every stat below reuses the numeric columns
+    # and pandas skips NaN natively, so no per-stat dropna copies
+    numeric_cols = ['Goals', 'Age']
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+
+    if df['Goals'].notna().any():
+        print(f"\n⚽ Goals — mean: {df['Goals'].mean():.2f}, max: {int(df['Goals'].max())}")
+
+    if df['Age'].notna().any():
+        print(f"🎂 Age — mean: {df['Age'].mean():.1f}, "
+              f"range: {int(df['Age'].min())}-{int(df['Age'].max())}")
+
+    print("\n🏆 Top scorers:")
+    for _, row in df.nlargest(10, 'Goals').iterrows():
+        print(f"  {row['Player Name']} ({row['Team/Club']}): {row['Goals']}")
+
+
+def _write_xlsx_streaming(df, path):
+    """
+    Stream a DataFrame to xlsx via openpyxl's write-only mode
+
+    Rows go straight to XML as they're appended, so peak memory stays
+    bounded no matter how many rows the frame has.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Players')
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append(row)
+    wb.save(path)
+
+
+def export_filtered_data(filename='enhanced_players_data.xlsx', filters=None,
+                         output_file='filtered_players.xlsx'):
+    """
+    Export a filtered subset of the scraped dataset
+
+    Args:
+        filename: Source Excel file
+        filters: Dict of column -> substring filters (case-insensitive)
+        output_file: Destination Excel file
+    """
+    try:
+        df = _read_players_sheet(filename)
+    except Exception as e:
+        print(f"❌ Could not read '{filename}': {e}")
+        return
+
+    filtered_df = df
+    if filters:
+        # One fused mask, one .loc at the end — no intermediate frame per
+        # filter; regex=False keeps pandas on the C substring-find path
+        mask = np.ones(len(filtered_df), dtype=bool)
+        for column, value in filters.items():
+            if column in filtered_df.columns:
+                mask &= filtered_df[column].astype(str).str.contains(
+                    str(value), case=False, na=False, regex=False).to_numpy()
+        filtered_df = filtered_df.loc[mask]
+
+    if len(filtered_df) > 5000:
+        # Large result sets: stream row-wise so the whole sheet never
+        # sits in memory
+        _write_xlsx_streaming(filtered_df, output_file)
+        print(f"✅ Exported {len(filtered_df)} players to '{output_file}'")
+        return
+
+    # Write columns straight through xlsxwriter: pandas' ExcelFormatter
+    # builds a styled cell dict per value, which is the slow part of
+    # to_excel; write_column streams each column's list in one call
+    workbook = xlsxwriter.Workbook(output_file, {'strings_to_urls': False})
+    worksheet = workbook.add_worksheet('Players')
+    worksheet.write_row(0, 0, list(filtered_df.columns))
+    for col_idx, column in enumerate(filtered_df.columns):
+        series = filtered_df[column]
+        if pd.api.types.is_numeric_dtype(series) and not series.hasnans:
+            values = series.tolist()
+        else:
+            # NaN would make write_column raise; map it to blank cells
+            values = series.astype(object).where(series.notna(), None).tolist()
+        worksheet.write_column(1, col_idx, values)
+    workbook.close()
+
+    print(f"✅ Exported {len(filtered_df)} players to '{output_file}'")
+
+
+def example_analysis():
+    """Run a couple of example analyses on the scraped dataset"""
+    analyze_scraped_data()
+
+    try:
+        df = _read_players_sheet('enhanced_players_data.xlsx', usecols=['Nationality'])
+    except Exception:
+        return
+
+    print("\n🌍 Top nationalities:")
+    # sort=False skips ordering the full distribution; nlargest does a
+    # heap-based partial sort for just the top 10
+    counts = df['Nationality'].value_counts(sort=False)
+    sys.stdout.write('\n'.join(
+        f"  {nationality}: {count}"
+        for nationality, count in counts.nlargest(10).items()
+        if nationality
+    ) + '\n')
+
+
+REQUIRED_PACKAGES = (
+    'httpx[http2]',
+    'beautifulsoup4',
+    'lxml',
+    'brotli',
+    'zstandard',
+    'pandas',
+    'xlsxwriter',
+    'openpyxl'
+)
+
+
+def install_requirements():
+    """Install the packages the scraper depends on"""
+    import subprocess
+
+    for package in REQUIRED_PACKAGES:
+        print(f"📦 Installing {package}...")
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
+
+    print("✅ All requirements installed")
+
+
+async def _run_scrape(target_count=None, enhance_details=None,
+                      filename='enhanced_players_data.xlsx', pretty=True):
+    """Scrape, save and clean up inside one event loop"""
+    scraper = EnhancedESPNPlayerScraper()
+    try:
+        players = await scraper.scrape_all_players_comprehensive(
+            target_count=target_count, enhance_details=enhance_details)
+        scraper.save_to_enhanced_excel(players, filename, pretty=pretty)
+    finally:
+        await scraper.close()
+
+
+def quick_start():
+    """Small scrape (50 players, no enhancement) for a fast first look"""
+    # Quick runs are for iteration, not stakeholders: CSV/Parquet only,
+    # skipping the comparatively slow formatted-Excel write
+    asyncio.run(_run_scrape(target_count=50, enhance_details=False,
+                            filename='quick_players_data.xlsx', pretty=False))
+
+
+def main():
+    """Menu-driven entry point"""
+    print("=" * 60)
+    print("  ⚽ ENHANCED ESPN PLAYER SCRAPER")
+    print("=" * 60)
+    print("1. Full scrape (with profile enhancement)")
+    print("2. Quick scrape (50 players, squads only)")
+    print("3. Analyze existing data")
+    print("4. Export filtered data")
+
+    choice = input("\nSelect an option (1-4): ").strip()
+
+    if choice == '1':
+        asyncio.run(_run_scrape())
+        example_analysis()
+    elif choice == '2':
+        quick_start()
+    elif choice == '3':
+        analyze_scraped_data()
+    elif choice == '4':
+        league = input("League to filter by (blank for all): ").strip()
+        filters = {'League': league} if league else None
+        export_filtered_data(filters=filters)
+    else:
+        print("❌ Invalid choice")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,67 @@
+import csv
+import os
+import sys
 import time
+import threading
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from lxml import html
 import re
 
+try:
+    from requests_cache import CachedSession
+except ImportError:
+    CachedSession = None
+
+# Compiled once; scanned for every zentriert cell of every player row
+_AGE_RE = re.compile(r'\((\d+)\)')
+_AGE_ONLY_RE = re.compile(r'^\d{2}$')
+
 class Ligue1SerieAScraper:
-    def __init__(self):
+    COLUMNS = ('Name', 'Age', 'Nationality', 'Club', 'League', 'Goals', 'Assists')
+
+    def __init__(self, use_cache=True):
         self.base_url = "https://www.transfermarkt.us"
-        self.players_data = []
-        self.driver = None
+        # Column-oriented storage: one list per column instead of a dict per
+        # player, so pandas builds its blocks straight from these lists
+        self.players_data = {col: [] for col in self.COLUMNS}
         self.scraped_teams = set()
-        
+        self.max_workers = 8
+        # Guards players_data/scraped_teams when team pages are fetched in parallel
+        self.data_lock = threading.Lock()
+
+        # Append-only crash log: each completed team's rows are flushed here so
+        # a crashed or interrupted run resumes without re-scraping done teams
+        self.partial_csv = 'players.partial.csv'
+        self._load_partial_rows()
+        write_header = not os.path.exists(self.partial_csv) or os.path.getsize(self.partial_csv) == 0
+        self.partial_file = open(self.partial_csv, 'a', newline='', encoding='utf-8')
+        self.partial_writer = csv.writer(self.partial_file)
+        if write_header:
+            self.partial_writer.writerow(self.COLUMNS)
+
+        # Transfermarkt pages are server-rendered static HTML, so a plain
+        # requests session replaces the whole Chrome/Selenium stack. With
+        # requests-cache installed, responses are memoized in SQLite so
+        # re-runs after an interrupt only fetch teams that are still missing.
+        if use_cache and CachedSession is not None:
+            self.session = CachedSession(
+                'tm_cache',
+                expire_after=timedelta(hours=24),
+                allowable_codes=(200,)
+            )
+            print("Using cached session (tm_cache.sqlite, 24h expiry)")
+        else:
+            if use_cache and CachedSession is None:
+                print("requests-cache not installed — fetching without on-disk cache")
+            self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+
         # League URLs
         self.leagues = {
             'Ligue 1': {
@@ -26,359 +73,324 @@ class Ligue1SerieAScraper:
                 'teams_count': 20
             }
         }
-    
-    def setup_driver(self):
-        """Setup Chrome driver with stealth options"""
-        chrome_options = Options()
-        
-        # Stealth settings
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--ignore-certificate-errors')
-        chrome_options.add_argument('--ignore-ssl-errors')
-        chrome_options.add_argument('--disable-software-rasterizer')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # Human-like preferences
-        prefs = {
-            "profile.default_content_setting_values.notifications": 2,
-            "credentials_enable_service": False,
-            "profile.password_manager_enabled": False
-        }
-        chrome_options.add_experimental_option("prefs", prefs)
-        
+
+    def _load_partial_rows(self):
+        """Reload rows persisted by a previous crashed/interrupted run"""
+        if not os.path.exists(self.partial_csv):
+            return
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.set_page_load_timeout(90)
-            
-            # Execute stealth scripts
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            })
-            
-            print("Chrome driver initialized successfully")
-        except Exception as e:
-            print(f"Error initializing Chrome driver: {e}")
-            raise
-    
+            df = pd.read_csv(self.partial_csv)
+        except Exception:
+            return
+        if df.empty:
+            return
+        for col in self.COLUMNS:
+            if col in df.columns:
+                self.players_data[col].extend(df[col].tolist())
+        self.scraped_teams.update(df['Club'].tolist())
+        print(f"Resuming: {len(df)} players from {len(self.scraped_teams)} teams already on disk")
+
+    def fetch_page(self, url, timeout=30):
+        """Fetch a page and parse it into an lxml tree"""
+        response = self.session.get(url, timeout=timeout)
+        response.raise_for_status()
+        if not getattr(response, 'from_cache', False):
+            time.sleep(1)  # politeness delay, skipped when served from cache
+        return html.fromstring(response.content)
+
     def get_league_teams(self, league_url, league_name, max_teams):
         """Get teams from a league"""
         print(f"\n{'='*70}")
         print(f"Fetching {league_name} teams...")
         print(f"{'='*70}\n")
-        
+
         try:
-            self.driver.get(league_url)
-            time.sleep(5)
-            
-            WebDriverWait(self.driver, 25).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "table.items"))
-            )
-            
+            tree = self.fetch_page(league_url)
+
             teams = []
             seen_teams = set()
-            
+
             # Find the main standings table
-            tables = self.driver.find_elements(By.CSS_SELECTOR, "table.items")
-            
+            tables = tree.xpath("//table[@class='items']")
+
             if not tables:
                 print("No tables found!")
                 return []
-            
+
             # Get the first table (main standings)
             main_table = tables[0]
-            team_rows = main_table.find_elements(By.CSS_SELECTOR, "tbody tr")
-            
+            team_rows = main_table.xpath(".//tbody/tr")
+
             print(f"Found {len(team_rows)} rows in main table")
-            
+
             for row in team_rows[:max_teams]:
                 try:
                     # Look for team name in the row
-                    team_links = row.find_elements(By.CSS_SELECTOR, "td.hauptlink a, td a.vereinprofil_tooltip")
-                    
+                    team_links = row.xpath(".//td[contains(@class, 'hauptlink')]//a | .//td/a[contains(@class, 'vereinprofil_tooltip')]")
+
                     if team_links:
                         team_link = team_links[0]
-                        team_name = team_link.text.strip()
-                        team_url = team_link.get_attribute('href')
-                        
+                        team_name = team_link.text_content().strip()
+                        team_url = team_link.get('href') or ''
+                        if team_url.startswith('/'):
+                            team_url = self.base_url + team_url
+
                         if team_name and team_url and team_name not in seen_teams and '/verein/' in team_url:
                             squad_url = team_url.replace('/startseite/', '/kader/').replace('/profil/', '/kader/')
-                            
+
                             # Ensure it's a kader URL
                             if '/kader/' not in squad_url:
                                 squad_url = team_url.rsplit('/', 1)[0] + '/kader/' + team_url.rsplit('/', 1)[1]
-                            
+
                             teams.append({
                                 'name': team_name,
                                 'url': squad_url
                             })
                             seen_teams.add(team_name)
                             print(f"  Added: {team_name}")
-                            
+
                             # Stop at max teams
                             if len(teams) >= max_teams:
                                 break
                 except Exception as e:
                     continue
-            
+
             print(f"\nSelected {len(teams)} {league_name} teams\n")
             return teams[:max_teams]
-            
-        except TimeoutException:
+
+        except requests.Timeout:
             print(f"Timeout loading {league_name} page")
             return []
         except Exception as e:
             print(f"Error fetching teams: {e}")
             return []
-    
+
     def scrape_team_players(self, team_name, team_url, league_name):
         """Scrape all players from a team"""
-        
-        if team_name in self.scraped_teams:
-            print(f"  Skipping {team_name} (already scraped)")
-            return
-        
+
+        with self.data_lock:
+            if team_name in self.scraped_teams:
+                print(f"  Skipping {team_name} (already scraped)")
+                return
+
         print(f"  Scraping: {team_name}")
-        
+        team_players = []
+
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                self.driver.get(team_url)
-                time.sleep(5 + attempt * 2)
-                
-                WebDriverWait(self.driver, 40).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "table.items"))
+                tree = self.fetch_page(team_url)
+
+                # One XPath pass selects exactly the player rows; the class
+                # filtering that used to happen row by row in Python is done
+                # inside the predicate
+                valid_rows = tree.xpath(
+                    "//table[@class='items']//tbody/tr"
+                    "[(contains(@class, 'odd') or contains(@class, 'even'))"
+                    " and not(contains(@class, 'thead'))]"
                 )
-                
-                # Wait a bit more for full page load
-                time.sleep(3)
-                
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                
-                player_rows = self.driver.find_elements(By.CSS_SELECTOR, "table.items tbody tr")
-                
-                valid_rows = []
-                for row in player_rows:
-                    row_class = row.get_attribute('class') or ''
-                    if ('odd' in row_class or 'even' in row_class) and 'thead' not in row_class:
-                        valid_rows.append(row)
-                
+
                 player_count = 0
-                
+
                 for row in valid_rows:
                     try:
-                        cells = row.find_elements(By.TAG_NAME, "td")
-                        
+                        cells = row.xpath("./td")
+
                         if len(cells) < 5:
                             continue
-                        
-                        # Get player name and URL
+
+                        # Get player name and URL — union XPath covers both the
+                        # hauptlink layout and the bare profile-link fallback
                         player_name = None
                         player_url = None
-                        
-                        try:
-                            name_link = row.find_element(By.CSS_SELECTOR, "td.hauptlink a")
-                            player_name = name_link.text.strip()
-                            player_url = name_link.get_attribute('href')
-                        except:
-                            try:
-                                links = row.find_elements(By.CSS_SELECTOR, "a[href*='/profil/']")
-                                if links:
-                                    player_name = links[0].text.strip()
-                                    player_url = links[0].get_attribute('href')
-                            except:
-                                pass
-                        
+
+                        name_links = row.xpath(
+                            ".//td[contains(@class, 'hauptlink')]//a[@href]"
+                            " | .//a[contains(@href, '/profil/')]"
+                        )
+                        if name_links:
+                            player_name = name_links[0].text_content().strip()
+                            player_url = name_links[0].get('href')
+
                         if not player_name or not player_url:
                             continue
-                        
+
                         # Get age
                         age = 'N/A'
-                        try:
-                            centered_cells = row.find_elements(By.CSS_SELECTOR, "td.zentriert")
-                            for cell in centered_cells:
-                                text = cell.text.strip()
-                                age_match = re.search(r'\((\d+)\)', text)
-                                if age_match:
-                                    age = age_match.group(1)
-                                    break
-                                elif text.isdigit() and 16 <= int(text) <= 45:
-                                    age = text
-                                    break
-                        except:
-                            pass
-                        
+                        for cell in row.xpath(".//td[contains(@class, 'zentriert')]"):
+                            text = cell.text_content().strip()
+                            age_match = _AGE_RE.search(text)
+                            if age_match:
+                                age = age_match.group(1)
+                                break
+                            elif _AGE_ONLY_RE.match(text) and 16 <= int(text) <= 45:
+                                age = text
+                                break
+
                         # Get nationality
                         nationality = 'N/A'
-                        try:
-                            flag_imgs = row.find_elements(By.CSS_SELECTOR, "img.flaggenrahmen")
-                            if flag_imgs:
-                                nationalities = [img.get_attribute('title') for img in flag_imgs if img.get_attribute('title')]
-                                nationality = ', '.join(nationalities) if nationalities else 'N/A'
-                        except:
-                            pass
-                        
-                        # Store player data
-                        player_data = {
-                            'Name': player_name,
-                            'Age': age,
-                            'Nationality': nationality,
-                            'Club': team_name,
-                            'League': league_name,
-                            'Goals': 0,
-                            'Assists': 0
-                        }
-                        
-                        self.players_data.append(player_data)
+                        flag_imgs = row.xpath(".//img[contains(@class, 'flaggenrahmen')]")
+                        if flag_imgs:
+                            nationalities = [img.get('title') for img in flag_imgs if img.get('title')]
+                            nationality = ', '.join(nationalities) if nationalities else 'N/A'
+
+                        # Store player data in COLUMNS order
+                        team_players.append((player_name, age, nationality, team_name, league_name, 0, 0))
                         player_count += 1
-                        
+
                     except Exception as e:
                         continue
-                
-                self.scraped_teams.add(team_name)
+
+                # Merge the thread-local rows column-wise and persist them to
+                # the crash log in one locked operation
+                with self.data_lock:
+                    if team_players:
+                        for col, values in zip(self.COLUMNS, zip(*team_players)):
+                            self.players_data[col].extend(values)
+                        self.partial_writer.writerows(team_players)
+                        self.partial_file.flush()
+                        os.fsync(self.partial_file.fileno())
+                    self.scraped_teams.add(team_name)
                 print(f"  {team_name}: {player_count} players")
                 break
-                
-            except TimeoutException:
+
+            except requests.Timeout:
                 if attempt < max_retries - 1:
                     print(f"  Timeout (attempt {attempt + 1}/{max_retries}), retrying...")
-                    time.sleep(8)
+                    time.sleep(3)
                 else:
                     print(f"  Failed after {max_retries} attempts - SKIPPING")
-                    self.scraped_teams.add(team_name)
+                    with self.data_lock:
+                        self.scraped_teams.add(team_name)
             except Exception as e:
                 if attempt < max_retries - 1:
                     print(f"  Error (attempt {attempt + 1}/{max_retries}), retrying...")
-                    time.sleep(8)
+                    time.sleep(3)
                 else:
                     print(f"  Error - SKIPPING")
-                    self.scraped_teams.add(team_name)
-    
+                    with self.data_lock:
+                        self.scraped_teams.add(team_name)
+
     def scrape_all_leagues(self):
         """Main scraping method for both leagues"""
         print("\n" + "="*70)
         print(" " * 15 + "LIGUE 1 & SERIE A SCRAPER")
         print("="*70)
-        
+
         for league_name, league_info in self.leagues.items():
             print(f"\n{'='*70}")
             print(f"{league_name.upper()}")
             print(f"{'='*70}")
-            
+
             teams = self.get_league_teams(
-                league_info['url'], 
-                league_name, 
+                league_info['url'],
+                league_name,
                 league_info['teams_count']
             )
-            
+
             if not teams:
                 print(f"No teams found for {league_name}!")
                 continue
-            
+
             print(f"{'='*70}")
             print(f"Starting to scrape {len(teams)} {league_name} teams...")
             print(f"{'='*70}\n")
-            
-            for i, team in enumerate(teams, 1):
-                print(f"[{i}/{len(teams)}] ", end="")
-                self.scrape_team_players(team['name'], team['url'], league_name)
-                
-                # Variable delay between teams
-                delay = 4 + (i % 2)
-                time.sleep(delay)
-        
+
+            # Team pages are independent and network-bound, so fetch them
+            # concurrently; the per-fetch politeness delay keeps the overall
+            # request rate at roughly max_workers requests per second
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self.scrape_team_players, team['name'], team['url'], league_name): team['name']
+                    for team in teams
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"  Error scraping {futures[future]}: {e}")
+                    print(f"  Progress: {done}/{len(teams)} teams")
+
         print(f"\n{'='*70}")
         print(f"Scraping completed!")
-        print(f"Total players collected: {len(self.players_data)}")
+        print(f"Total players collected: {len(self.players_data['Name'])}")
         print(f"{'='*70}")
-    
+
     def save_to_excel(self, filename='ligue1_seriea_players.xlsx'):
         """Save data to Excel"""
-        if not self.players_data:
+        if not self.players_data['Name']:
             print("\nNo data to save!")
             return
-        
+
+        # Columns are already in COLUMNS order, so no reindexing needed
         df = pd.DataFrame(self.players_data)
-        
+
         # Remove duplicates
         df = df.drop_duplicates(subset=['Name', 'Club'])
-        
-        # Reorder columns
-        columns_order = ['Name', 'Age', 'Nationality', 'Club', 'League', 'Goals', 'Assists']
-        df = df[columns_order]
-        
+
         # Save to Excel
         df.to_excel(filename, index=False, engine='openpyxl')
-        
+
         print(f"\n{'='*70}")
         print(f"DATA SAVED")
         print(f"{'='*70}")
         print(f"Filename: {filename}")
         print(f"Total players: {len(df)}")
-        
+
+        # Formatted straight from the Series instead of Python print loops
         print(f"\nPlayers per league:")
-        league_counts = df['League'].value_counts()
-        for league, count in league_counts.items():
-            print(f"  {league}: {count} players")
-        
+        print(df['League'].value_counts().to_string())
+
         print(f"\nPlayers per club:")
-        club_counts = df['Club'].value_counts()
-        for club, count in club_counts.items():
-            print(f"  {club}: {count} players")
-        
+        print(df['Club'].value_counts().to_string())
+
         print(f"\nTop 5 Nationalities:")
-        nat_counts = df['Nationality'].value_counts().head(5)
-        for nat, count in nat_counts.items():
-            print(f"  {nat}: {count} players")
-        
-        # Calculate average age (excluding N/A)
-        valid_ages = df[df['Age'] != 'N/A']['Age'].astype(int)
-        if len(valid_ages) > 0:
-            print(f"\nAverage Age: {valid_ages.mean():.1f} years")
-        
+        print(df['Nationality'].value_counts().head(5).to_string())
+
+        # coerce turns 'N/A' into NaN, which mean() skips — no boolean-mask
+        # copy of the column needed
+        mean_age = pd.to_numeric(df['Age'], errors='coerce').mean()
+        if pd.notna(mean_age):
+            print(f"\nAverage Age: {mean_age:.1f} years")
+
         print(f"{'='*70}")
-    
+
     def close(self):
-        """Close browser"""
-        if self.driver:
-            self.driver.quit()
-            print("\nBrowser closed")
+        """Close the HTTP session and the crash-log file"""
+        self.session.close()
+        self.partial_file.close()
 
 
 def main():
     """Main execution"""
     scraper = None
-    
+
     try:
         print("\n" + "="*70)
         print("  LIGUE 1 & SERIE A SCRAPER - Transfermarkt.com")
         print("="*70)
-        print("\nRequired: selenium pandas openpyxl")
-        print("Install: pip install selenium pandas openpyxl\n")
-        
-        scraper = Ligue1SerieAScraper()
-        scraper.setup_driver()
-        
+        print("\nRequired: requests lxml pandas openpyxl (optional: requests-cache)")
+        print("Install: pip install requests lxml pandas openpyxl requests-cache\n")
+
+        scraper = Ligue1SerieAScraper(use_cache='--no-cache' not in sys.argv)
+
         print("\nStarting scrape...")
         print("Ligue 1: 18 teams | Serie A: 20 teams")
-        print("Estimated time: 15-20 minutes\n")
-        
+        print("Estimated time: 2-3 minutes\n")
+
         scraper.scrape_all_leagues()
         scraper.save_to_excel('ligue1_seriea_players.xlsx')
-        
+
+        # Full save succeeded — the crash log is no longer needed
+        scraper.close()
+        if os.path.exists(scraper.partial_csv):
+            os.remove(scraper.partial_csv)
+
         print("\nAll done! Check 'ligue1_seriea_players.xlsx' for results.")
-        
+
     except KeyboardInterrupt:
         print("\n\nScraping interrupted by user")
-        if scraper and scraper.players_data:
+        if scraper and scraper.players_data['Name']:
             print("Saving partial data...")
             scraper.save_to_excel('ligue1_seriea_players_partial.xlsx')
     except Exception as e:
@@ -391,4 +403,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,60 @@
+import functools
 import joblib
 import numpy as np
 import os
 
+class _OnnxClassifier:
+    """
+    Minimal predict_proba/classes_ adapter over an onnxruntime session
+
+    Lets the rest of the predictor keep calling the sklearn interface while
+    inference runs through ONNX Runtime's fused tree-ensemble kernel.
+    """
+    def __init__(self, session, classes):
+        self._session = session
+        self._input = session.get_inputs()[0].name
+        self._proba = session.get_outputs()[1].name
+        self.classes_ = classes
+
+    def predict_proba(self, X):
+        return self._session.run([self._proba], {self._input: np.asarray(X, dtype=np.float32)})[0]
+
+@functools.lru_cache(maxsize=1)
+def _load_models_cached(models_dir):
+    """
+    Load the model and encoders from disk exactly once per process
+
+    Repeat calls (e.g. when imported as a library) return the cached tuple
+    instead of re-reading and unpickling the files.
+    """
+    # mmap the big tree arrays read-only so repeated loads and sibling
+    # processes share one page-cache copy
+    class_model = joblib.load(os.path.join(models_dir, 'classification_model.pkl'), mmap_mode='r')
+
+    # Use the ONNX export from training when both it and onnxruntime are
+    # available; predict_proba then runs as one native kernel instead of
+    # Python-level tree walking
+    onnx_path = os.path.join(models_dir, 'classification_model.onnx')
+    if os.path.exists(onnx_path):
+        try:
+            import onnxruntime as ort
+            session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+            class_model = _OnnxClassifier(session, np.asarray(class_model.classes_))
+            print("✅ Using ONNX Runtime for inference")
+        except ImportError:
+            print("ℹ️ onnxruntime not installed — using the sklearn model")
+
+    home_encoder = joblib.load(os.path.join(models_dir, 'home_team_encoder.pkl'))
+    away_encoder = joblib.load(os.path.join(models_dir, 'away_team_encoder.pkl'))
+    result_encoder = joblib.load(os.path.join(models_dir, 'result_encoder.pkl'))
+
+    # O(1) name -> id maps; LabelEncoder.transform does a searchsorted plus
+    # validation pass per call, which adds up when predict_many fans out
+    for encoder in (home_encoder, away_encoder):
+        encoder._idx = {name: i for i, name in enumerate(encoder.classes_)}
+
+    return class_model, home_encoder, away_encoder, result_encoder
+
 def load_saved_models():
     """
     Load the trained classification model and encoders
@@ -13,15 +66,15 @@ def load_saved_models():
     
     try:
         print("🔄 Loading saved models and encoders...")
-        
-        # Load classification model
-        class_model = joblib.load(os.path.join(models_dir, 'classification_model.pkl'))
-        
-        # Load encoders
-        home_encoder = joblib.load(os.path.join(models_dir, 'home_team_encoder.pkl'))
-        away_encoder = joblib.load(os.path.join(models_dir, 'away_team_encoder.pkl'))
-        result_encoder = joblib.load(os.path.join(models_dir, 'result_encoder.pkl'))
-        
+
+        # Cached loader: only the first call per process touches the disk
+        class_model, home_encoder, away_encoder, result_encoder = _load_models_cached(models_dir)
+
+        # Case-insensitive lookup tables, built once per session so team
+        # matching is a dict hit instead of rescanning classes_ per input
+        for encoder in (home_encoder, away_encoder):
+            encoder._lower_map = {team.lower(): team for team in encoder.classes_}
+
         print("✅ Models and encoders loaded successfully!")
         
         # Display available teams
@@ -56,25 +109,30 @@ def get_team_input(prompt, encoder, team_type):
         str: Valid team name or None if cancelled
     """
     available_teams = list(encoder.classes_)
-    
+    lower_map = getattr(encoder, '_lower_map', None)
+    if lower_map is None:
+        lower_map = {team.lower(): team for team in available_teams}
+        encoder._lower_map = lower_map
+
     while True:
         team_input = input(prompt).strip()
-        
+        team_lower = team_input.lower()
+
         # Allow user to quit
-        if team_input.lower() in ['quit', 'exit', 'q']:
+        if team_lower in ['quit', 'exit', 'q']:
             return None
-        
-        # Check if team exists (case-insensitive)
-        team_matches = [team for team in available_teams if team.lower() == team_input.lower()]
-        
-        if team_matches:
-            return team_matches[0]  # Return the correctly cased team name
-        
+
+        # Check if team exists (case-insensitive) — O(1) dict lookup
+        canonical = lower_map.get(team_lower)
+
+        if canonical is not None:
+            return canonical  # Return the correctly cased team name
+
         # If not found, show suggestions
         print(f"❌ '{team_input}' not found in available teams.")
-        
-        # Find similar team names
-        suggestions = [team for team in available_teams if team_input.lower() in team.lower()]
+
+        # Find similar team names (lowercased names are precomputed in the map)
+        suggestions = [team for lower, team in lower_map.items() if team_lower in lower]
         
         if suggestions:
             print(f"💡 Did you mean one of these?")
@@ -86,40 +144,49 @@ def get_team_input(prompt, encoder, team_type):
         print(f"   Type 'quit' to exit")
         print()
 
+# Template row with the default values for the 15 non-team features; only the
+# two team slots change per prediction. Since we only have team names, the
+# rest are reasonable averages:
+#   home/away_recent_form, home/away avg goals for+against, win rates,
+#   strengths, goal differences, h2h_home_advantage, matches_played
+_TEMPLATE = np.array(
+    [[0, 0, 1.5, 1.3, 1.7, 1.1, 1.3, 1.5, 0.5, 0.35, 1.0, 0.8, 0.6, -0.2, 0.5, 10, 10]],
+    dtype=np.float32
+)
+
 def create_feature_vector(home_encoded, away_encoded):
     """
     Create feature vector for prediction (using average values for missing features)
-    
+
     Args:
         home_encoded: Encoded home team
         away_encoded: Encoded away team
-    
+
     Returns:
         np.array: Feature vector for prediction
     """
-    # For the advanced model, we need 15 features
-    # Since we only have team names, we'll use reasonable default values for other features
-    features = [
-        home_encoded,      # home_team_encoded
-        away_encoded,      # away_team_encoded
-        1.5,              # home_recent_form (average)
-        1.3,              # away_recent_form (average)
-        1.7,              # home_avg_goals_for (average home goals)
-        1.1,              # home_avg_goals_against
-        1.3,              # away_avg_goals_for (average away goals)
-        1.5,              # away_avg_goals_against
-        0.5,              # home_win_rate (50%)
-        0.35,             # away_win_rate (35% - away disadvantage)
-        1.0,              # home_strength (average)
-        0.8,              # away_strength (slightly lower for away)
-        0.6,              # goal_difference_home
-        -0.2,             # goal_difference_away
-        0.5,              # h2h_home_advantage (neutral)
-        10,               # matches_played_home
-        10                # matches_played_away
-    ]
-    
-    return np.array([features])
+    # Copy the ready-made template and patch the two team slots; avoids the
+    # Python list construction and dtype inference per call
+    buf = _TEMPLATE.copy()
+    buf[0, 0] = home_encoded
+    buf[0, 1] = away_encoded
+    return buf
+
+def create_feature_matrix(home_encoded, away_encoded):
+    """
+    Stack N encoded team pairs onto the default-feature template
+
+    Args:
+        home_encoded: Sequence of encoded home teams
+        away_encoded: Sequence of encoded away teams
+
+    Returns:
+        np.array: (N, 17) feature matrix
+    """
+    X = np.tile(_TEMPLATE, (len(home_encoded), 1))
+    X[:, 0] = home_encoded
+    X[:, 1] = away_encoded
+    return X
 
 def predict_match_result(class_model, home_encoder, away_encoder, result_encoder, home_team, away_team):
     """
@@ -134,20 +201,21 @@ def predict_match_result(class_model, home_encoder, away_encoder, result_encoder
         tuple: (predicted_result, confidence, probabilities)
     """
     try:
-        # Encode team names
-        home_encoded = home_encoder.transform([home_team])[0]
-        away_encoded = away_encoder.transform([away_team])[0]
+        # Encode team names via the precomputed lookup maps
+        home_encoded = home_encoder._idx[home_team]
+        away_encoded = away_encoder._idx[away_team]
         
         # Create feature vector
         X_predict = create_feature_vector(home_encoded, away_encoded)
         
-        # Make prediction
-        prediction_encoded = class_model.predict(X_predict)[0]
+        # Make prediction — one predict_proba pass covers label and confidence
         prediction_proba = class_model.predict_proba(X_predict)[0]
-        
+        best_idx = int(np.argmax(prediction_proba))
+        prediction_encoded = class_model.classes_[best_idx]
+
         # Decode result
         predicted_result = result_encoder.inverse_transform([prediction_encoded])[0]
-        confidence = np.max(prediction_proba)
+        confidence = prediction_proba[best_idx]
         
         # Get probabilities for each outcome
         prob_dict = {}
@@ -160,6 +228,45 @@ def predict_match_result(class_model, home_encoder, away_encoder, result_encoder
         print(f"❌ Error making prediction: {str(e)}")
         return None, None, None
 
+def predict_many(class_model, home_encoder, away_encoder, result_encoder, home_teams, away_teams):
+    """
+    Predict a whole list of matches with one predict_proba call
+
+    sklearn amortizes its per-call overhead (validation, tree-traversal
+    glue) almost perfectly across rows, so bulk fixture lists should go
+    through here instead of looping predict_match_result.
+
+    Args:
+        class_model: Trained classification model
+        home_encoder, away_encoder, result_encoder: Encoders
+        home_teams, away_teams: Sequences of team names (same length)
+
+    Returns:
+        pd.DataFrame with home_team, away_team, predicted_result,
+        confidence and one probability column per outcome class
+    """
+    import pandas as pd
+
+    home_teams = list(home_teams)
+    away_teams = list(away_teams)
+    home_encoded = np.fromiter((home_encoder._idx[n] for n in home_teams), dtype=np.int32, count=len(home_teams))
+    away_encoded = np.fromiter((away_encoder._idx[n] for n in away_teams), dtype=np.int32, count=len(away_teams))
+    X = create_feature_matrix(home_encoded, away_encoded)
+
+    proba = class_model.predict_proba(X)
+    best_idx = proba.argmax(axis=1)
+    predicted = result_encoder.inverse_transform(class_model.classes_[best_idx])
+
+    results = pd.DataFrame({
+        'home_team': list(home_teams),
+        'away_team': list(away_teams),
+        'predicted_result': predicted,
+        'confidence': proba[np.arange(len(proba)), best_idx],
+    })
+    for i, result_class in enumerate(result_encoder.inverse_transform(class_model.classes_)):
+        results[f'prob_{result_class}'] = proba[:, i]
+    return results
+
 def format_prediction_output(predicted_result, home_team, away_team, confidence, probabilities):
     """
     Format and print the prediction result in user-friendly format